@@ -1,8 +1,11 @@
-import random
+import itertools
+import os
 import re
 from collections import Counter
-from typing import List, Optional, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Dict, Tuple, Iterator, Union, Set
 
+import numpy as np
 import pandas as pd
 from spacy.tokens import Token
 from tqdm import tqdm
@@ -30,6 +33,47 @@ from presidio_evaluator.data_generator.extensions import (
     generate_us_driver_licenses,
 )
 
+_TEMPLATE_RE = re.compile(r"\{([A-Z_0-9]+)\}")
+_DIGIT_TABLE = str.maketrans("", "", "0123456789")
+_BRACKET_TABLE = str.maketrans("[]", "()")
+_VOWELS = frozenset("aeiou")
+# output endings after which "a" is turned into "an"
+_ARTICLE_TAILS = frozenset((" a ", " A "))
+_ARTICLE_START = frozenset(("a ", "A "))
+
+_LOCATIONS = ("LOCATION", "CITY", "STATE", "COUNTRY", "ADDRESS", "STREET")
+_NAMES = ("FIRST_NAME", "LAST_NAME", "PERSON")
+_LOCATIONS_SET = frozenset(_LOCATIONS)
+_NAMES_SET = frozenset(_NAMES)
+_TAG_MAP = {
+    **{location: "LOCATION" for location in _LOCATIONS},
+    **{name: "PERSON" for name in _NAMES},
+}
+_LOCATIONS_ARR = np.array(_LOCATIONS, dtype=object)
+_NAMES_ARR = np.array(_NAMES, dtype=object)
+# below this number of spans, a python loop is faster than numpy
+_VECTORIZED_SPANS_THRESHOLD = 64
+_LOC_NAME_RE = re.compile(r"\[(" + "|".join(_LOCATIONS + _NAMES) + r")\]")
+
+# FakeNameGenerator.com columns and the entity names they are renamed to
+_FAKE_PII_COLUMN_NAMES = {
+    "Surname": "LAST_NAME",
+    "GivenName": "FIRST_NAME",
+    "Title": "TITLE",
+    "Gender": "GENDER",
+    "City": "CITY",
+    "ZipCode": "ZIP",
+    "CountryFull": "COUNTRY",
+    "Occupation": "OCCUPATION",
+    "TelephoneNumber": "PHONE_NUMBER",
+    "CCNumber": "CREDIT_CARD",
+    "Birthday": "BIRTHDAY",
+    "EmailAddress": "EMAIL_ADDRESS",
+    "StreetAddress": "FULL_ADDRESS",
+    "Domain": "DOMAIN_NAME",
+    "NameSet": "NAMESET",
+}
+
 
 class FakeDataGenerator:
     def __init__(
@@ -58,6 +102,8 @@ class FakeDataGenerator:
         "I'm changing my name from [FIRST_NAME] to [FIRST_NAME2].
         More than two are currently not supported but extending this
         is straightforward.
+        Templates are parsed on construction, changing self.templates
+        afterwards has no effect on the generated samples.
         :param lower_case_ratio: Percentage of names that should start
         with lower case
         :param include_metadata: Whether to include additional
@@ -77,13 +123,16 @@ class FakeDataGenerator:
 
         if dictionary_path:
             vocab_df = pd.read_csv(dictionary_path, sep=",")
-            self.vocabulary_words = set(vocab_df["WORD"].values.tolist())
+            # lower cased once, tokens are lower cased on lookup
+            self.vocabulary_words = frozenset(
+                vocab_df["WORD"].dropna().astype(str).str.lower()
+            )
         else:
             print(
                 "Warning: Dictionary path not provided. "
                 "Feature `is_in_vocabulary` will be set to False for all samples"
             )
-            self.vocabulary_words = []
+            self.vocabulary_words = frozenset()
         Token.set_extension(
             "is_in_vocabulary", getter=self.get_is_in_vocabulary, force=True
         )
@@ -96,8 +145,18 @@ class FakeDataGenerator:
         else:
             self.templates = None
 
+        # Templates are parsed once here instead of on every sampled example
+        (
+            self._compiled_templates,
+            self._template_entity_counts,
+        ) = self._compile_templates(self.templates)
+
         self.original_pii_df = fake_pii_df
         self.fake_pii = None #why? what does it do?
+        self._fake_pii_columns = {}
+        self._fake_pii_n = 0
+        self._template_slots = []
+        self._derived_from_fake_pii = None
         self.span_to_tag = span_to_tag
         self.labeling_scheme = labeling_scheme
 
@@ -116,72 +175,71 @@ class FakeDataGenerator:
         i.e. Susannah nameset is Dutch but the person can be from United States. 
         """
         
-        # define new column names
+        # change column names
         column_names = {
-            "Surname": "LAST_NAME",
-            "GivenName": "FIRST_NAME",
-            "Title": "TITLE",
-            "Gender": "GENDER",
-            "City": "CITY",
-            "ZipCode": "ZIP",
-            "CountryFull": "COUNTRY",
-            "Occupation": "OCCUPATION",
-            "TelephoneNumber": "PHONE_NUMBER",
-            "CCNumber": "CREDIT_CARD",
-            "Birthday": "BIRTHDAY",
-            "EmailAddress": "EMAIL_ADDRESS",
-            "StreetAddress": "FULL_ADDRESS",
-            "Domain": "DOMAIN_NAME",
-            "NameSet": "NAMESET",
+            key: value
+            for (key, value) in _FAKE_PII_COLUMN_NAMES.items()
+            if value not in self.ignore_types
         }
 
+        # Work on a copy, the input frame is kept as is
+        df = df.copy()
+
         # Remove brackets as they interfere with the process
+        for col in df.select_dtypes(include="object").columns:
+            # only str cells, other values in object columns are kept as is
+            df[col] = df[col].map(
+                lambda v: v.translate(_BRACKET_TABLE) if isinstance(v, str) else v
+            )
 
-        def remove_brackets(series):
-            if series.dtype == str:
-                series = series.str.replace("[", "(")
-                series = series.str.replace("]", ")")
-            return series
+        df = df.rename(columns=column_names)
 
-        df = df.apply(remove_brackets, axis=0)
+        # New columns are collected here and added to df in one step
+        new_cols = {}
 
-        # change column names
-        column_names = {
-            key: value
-            for (key, value) in column_names.items()
-            if value not in self.ignore_types
-        }
-        df.rename(columns=column_names, inplace=True)
+        def column(name):
+            # the latest values of a column, as a Series aligned with df
+            if name not in new_cols:
+                return df[name]
+            values = new_cols[name]
+            if isinstance(values, pd.Series):
+                return values
+            return pd.Series(values, index=df.index)
 
         # define PERSON as FIRST_NAME + LAST_NAME
         if "FIRST_NAME"in df.columns and "LAST_NAME" in df.columns:
-            df["PERSON"] = df["FIRST_NAME"] + " " + df["LAST_NAME"]
+            new_cols["PERSON"] = df["FIRST_NAME"] + " " + df["LAST_NAME"]
 
         if "COUNTRY" not in self.ignore_types:
-            df["COUNTRY"] = generate_country(
+            new_cols["COUNTRY"] = generate_country(
                 len(df), self.nationality_generator
             )  # replace previous country which has limited options
 
         # Copied entities
         if "DATE_TIME" not in self.ignore_types:
             if "BIRTHDAY" in df:
-                df["DATE_TIME"] = df["BIRTHDAY"]
+                new_cols["DATE_TIME"] = df["BIRTHDAY"]
             else:
                 print("DATE is taken from the BIRTHDAY column which is missing")
 
         if "LOCATION" not in self.ignore_types and "LOCATION" in df.columns:
-            df["LOCATION"] = df[random.choice(["CITY", "COUNTRY"])].str.title()
-            df["LOCATION"] = self._reshuffle_entity(
-                df["LOCATION"]
-            )  # Reshuffle to not have the same location and country
+            # Each row takes either a city or a country, from a shuffled row
+            # to not have the same location and country
+            shuffled = np.random.permutation(len(df))
+            is_city = np.random.random(len(df)) < 0.5
+            new_cols["LOCATION"] = np.where(
+                is_city,
+                column("CITY").str.title().to_numpy()[shuffled],
+                column("COUNTRY").str.title().to_numpy()[shuffled],
+            )
 
         if "ADDRESS" not in self.ignore_types:
-            self._address_parts(df)
+            new_cols.update(self._address_parts(df))
 
         # title and role
         if "ROLE" not in self.ignore_types:
             print("Generating roles")
-            df["ROLE"] = generate_roles(length=len(df))
+            new_cols["ROLE"] = generate_roles(length=len(df))
         if "TITLE" not in self.ignore_types:
             print("Generating titles")
             if "GENDER" not in df:
@@ -189,38 +247,44 @@ class FakeDataGenerator:
                     "Cannot generate title without a GENDER column. Generating FEMALE_TITLE and MALE_TITLE"
                 )
             else:
-                df["TITLE"] = generate_titles(df["GENDER"])
-            df["FEMALE_TITLE"] = [generate_title("female") for _ in range(len(df))]
-            df["MALE_TITLE"] = [generate_title("male") for _ in range(len(df))]
+                new_cols["TITLE"] = generate_titles(df["GENDER"])
+            new_cols["FEMALE_TITLE"] = [
+                generate_title("female") for _ in range(len(df))
+            ]
+            new_cols["MALE_TITLE"] = [generate_title("male") for _ in range(len(df))]
 
         if "NATIONALITY" not in self.ignore_types:
             print("Generating nationalities")
-            df["NATIONALITY"] = generate_nationality(
+            new_cols["NATIONALITY"] = generate_nationality(
+                len(df), self.nationality_generator
+            )
+            new_cols["NATION_MAN"] = generate_nation_man(
                 len(df), self.nationality_generator
             )
-            df["NATION_MAN"] = generate_nation_man(len(df), self.nationality_generator)
-            df["NATION_WOMAN"] = generate_nation_woman(
+            new_cols["NATION_WOMAN"] = generate_nation_woman(
                 len(df), self.nationality_generator
             )
-            df["NATION_PLURAL"] = generate_nation_plural(
+            new_cols["NATION_PLURAL"] = generate_nation_plural(
                 len(df), self.nationality_generator
             )
 
         if "IBAN" not in self.ignore_types:
             print("Generating IBANs")
-            df["IBAN"] = generate_iban(df["COUNTRY"])  # "IL270126100000000544211"
+            new_cols["IBAN"] = generate_iban(
+                column("COUNTRY")
+            )  # "IL270126100000000544211"
 
         if "IP_ADDRESS" not in self.ignore_types:
             print("Generating IP addresses")
-            df["IP_ADDRESS"] = generate_ip_addresses(len(df))
+            new_cols["IP_ADDRESS"] = generate_ip_addresses(len(df))
 
         if "US_SSN" not in self.ignore_types:
             print("Generating SSN numbers")
-            df["US_SSN"] = generate_SSNs(len(df))
+            new_cols["US_SSN"] = generate_SSNs(len(df))
 
         if "US_DRIVER_LICENSE" not in self.ignore_types:
             print("Generating US driver license numbers")
-            df["US_DRIVER_LICENSE"] = generate_us_driver_licenses(
+            new_cols["US_DRIVER_LICENSE"] = generate_us_driver_licenses(
                 len(df), self.us_driver_license_generator
             )
 
@@ -229,49 +293,62 @@ class FakeDataGenerator:
             if "DOMAIN_NAME" not in df:
                 print("Cannot generate url without a domain name")
             else:
-                df["URL"] = generate_url(df["DOMAIN_NAME"])
+                new_cols["URL"] = generate_url(df["DOMAIN_NAME"])
 
         if "ORGANIZATION" not in self.ignore_types:
             print("Generating company names")
-            df["ORG"] = generate_company_names(len(df), self.org_name_generator)
+            new_cols["ORG"] = generate_company_names(len(df), self.org_name_generator)
             if "Company" in df:
-                df["ORGANIZATION"] = df[random.choice(["Company", "ORG"])].str.title()
+                # Each row takes either the original or the generated company
+                is_company = np.random.random(len(df)) < 0.5
+                new_cols["ORGANIZATION"] = np.where(
+                    is_company,
+                    column("Company").str.title(),
+                    column("ORG").str.title(),
+                )
             else:
                 # Keep both
-                df["ORGANIZATION"] = df["ORG"]
+                new_cols["ORGANIZATION"] = new_cols["ORG"]
+
+        df = df.assign(**new_cols)
 
         print("Finished preparing fake PII data")
 
         return df
 
-    def _address_parts(self, df):
-        # extract street no, street and full address
+    def _address_parts(self, df) -> Dict[str, pd.Series]:
+        """
+        Extract street no, street and full address
+        :return: dict of the new column names and values
+        """
         print("Generating address parts")
-        if "STREET_NO" not in self.ignore_types and "STREET_NO" in df.columns:
-            df["STREET_NO"] = df["FULL_ADDRESS"].map(
-                lambda r: re.search(r"([\d]+)", r).group(1)
-            )
-        if "STREET" not in self.ignore_types and "STREET" in df.columns:
-            df["STREET"] = df["FULL_ADDRESS"].map(
-                lambda r: re.search(r"[\d]+(.*)", r).group(1)
-            )
-        if "ADDRESS" not in self.ignore_types and ("FULL_ADDRESS" in df.columns and "ZIP" in df.columns and "CITY in df.columns"):
-            df["ADDRESS"] = df.apply(
-                lambda r: "{0}, {2} {1}".format(
-                    r["FULL_ADDRESS"], r["ZIP"].replace(" ", ""), r["CITY"]
-                ),
-                axis=1,
+        address_cols = {}
+        add_street_no = (
+            "STREET_NO" not in self.ignore_types and "STREET_NO" in df.columns
+        )
+        add_street = "STREET" not in self.ignore_types and "STREET" in df.columns
+        if add_street_no or add_street:
+            street_parts = df["FULL_ADDRESS"].str.extract(r"(\d+)(.*)")
+            if add_street_no:
+                address_cols["STREET_NO"] = street_parts[0]
+            if add_street:
+                address_cols["STREET"] = street_parts[1]
+        if "ADDRESS" not in self.ignore_types and (
+            "FULL_ADDRESS" in df.columns
+            and "ZIP" in df.columns
+            and "CITY" in df.columns
+        ):
+            address_cols["ADDRESS"] = (
+                df["FULL_ADDRESS"].astype(str)
+                + ", "
+                + df["CITY"].astype(str)
+                + " "
+                + df["ZIP"].astype(str).str.replace(" ", "", regex=False)
             )
+        return address_cols
 
-    @staticmethod
-    def _get_additional_entity(df, entity):
-        return df.sample(1).iloc[0][entity]
-
-    @staticmethod
-    def _reshuffle_entity(series):
-        shuffled = series.sample(frac=1)
-        shuffled.reset_index(inplace=True, drop=True)
-        return shuffled
+    def _get_additional_entity(self, entity, rng: np.random.Generator):
+        return self._fake_pii_columns[entity][rng.integers(self._fake_pii_n)]
 
     @staticmethod
     def _prep_templates(raw_templates: List[str]) -> List[str]:
@@ -292,11 +369,48 @@ class FakeDataGenerator:
         ]
         return templates
 
+    @classmethod
+    def _compile_templates(
+        cls, templates: Optional[List[str]]
+    ) -> Tuple[List[Tuple[str, List[Tuple[str, str, str]], str]], List[Counter]]:
+        """
+        Run get_template_entities and _split_template once per template,
+        so that sampling only needs to index into the result
+        :return: per template, the indexed template with its segments and
+        the text after them, and the per template entity counts
+        """
+        compiled = []
+        entity_counts = []
+        for template in templates or []:
+            template, _, entities_count = cls.get_template_entities(template)
+            segments, text_after = cls._split_template(template)
+            compiled.append((template, segments, text_after))
+            entity_counts.append(entities_count)
+        return compiled, entity_counts
+
+    @staticmethod
+    def _split_template(template: str) -> Tuple[List[Tuple[str, str, str]], str]:
+        """
+        Split a template into its placeholders and the text around them
+        :param template: template with indexed placeholders (e.g. {LOCATION2})
+        :return: a list of (text before, placeholder, entity type) per placeholder,
+        and the text after the last placeholder
+        """
+        segments = []
+        last_end = 0
+        for m in _TEMPLATE_RE.finditer(template):
+            placeholder = m.group(1)
+            # Remove duplicate entity indices:
+            entity = placeholder.translate(_DIGIT_TABLE)
+            segments.append((template[last_end : m.start()], placeholder, entity))
+            last_end = m.end()
+        return segments, template[last_end:]
+
     @staticmethod
     def get_template_entities(template: str):
         templates = []
         entities_count = Counter()
-        for m in re.finditer(r"\{([A-Z_0-9]+)\}", template):
+        for m in _TEMPLATE_RE.finditer(template):
             ent = m.groups()[0]
             start, end = m.span()
             entities_count[ent] += 1
@@ -316,53 +430,244 @@ class FakeDataGenerator:
         return template, templates, entities_count
 
     def sample_examples(
-        self, count: int, genders: List[str] = None, namesets: List[str] = None
+        self,
+        count: int,
+        genders: List[str] = None,
+        namesets: List[str] = None,
+        seed: Optional[int] = None,
     ):
+        samples = self._generate_samples(count, genders, namesets, seed=seed)
+        for input_sample, _, _ in samples:
+            yield input_sample
+
+    def sample_examples_bulk(
+        self,
+        count: int,
+        genders: List[str] = None,
+        namesets: List[str] = None,
+        seed: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Generate count samples as columns of a DataFrame
+        instead of yielding InputSample objects one by one
+        :param count: number of samples to generate
+        :param genders: genders to sample fake PII from (all if None)
+        :param namesets: name sets to sample fake PII from (all if None)
+        :param seed: seed of the random draws
+        (if None, derived from the global numpy random state)
+        :return: pd.DataFrame with one row per sample and the columns
+        full_text, masked, spans, lowercase, template_idx
+        (and tokens, tags if span_to_tag is set)
+        """
+        full_texts = [None] * count
+        masked = [None] * count
+        spans = [None] * count
+        tokens = [None] * count
+        tags = [None] * count
+        lowercase = np.empty(count, dtype=bool)
+        template_idx = np.empty(count, dtype=np.int64)
+
+        samples = self._generate_samples(count, genders, namesets, seed=seed)
+        for i, (input_sample, template_sentence_index, to_lower) in enumerate(samples):
+            full_texts[i] = input_sample.full_text
+            masked[i] = input_sample.masked
+            spans[i] = input_sample.spans
+            if self.span_to_tag:
+                tokens[i] = input_sample.tokens
+                tags[i] = input_sample.tags
+            lowercase[i] = to_lower
+            template_idx[i] = template_sentence_index
+
+        columns = {
+            "full_text": full_texts,
+            "masked": masked,
+            "spans": spans,
+            "lowercase": lowercase,
+            "template_idx": template_idx,
+        }
+        if self.span_to_tag:
+            columns["tokens"] = tokens
+            columns["tags"] = tags
+        return pd.DataFrame(columns)
+
+    def sample_examples_parallel(
+        self,
+        count: int,
+        n_workers: Optional[int] = None,
+        genders: List[str] = None,
+        namesets: List[str] = None,
+        seed: Optional[int] = None,
+    ) -> List[InputSample]:
+        """
+        Generate count samples using multiple processes
+        :param count: number of samples to generate
+        :param n_workers: number of processes (defaults to the number of CPUs).
+        Samples are generated serially if n_workers <= 1
+        :param genders: genders to sample fake PII from (all if None)
+        :param namesets: name sets to sample fake PII from (all if None)
+        :param seed: seed from which each worker's random state is derived
+        (if None, derived from the global numpy random state)
+        :return: a list of the generated InputSamples
+        """
+        if n_workers is None:
+            n_workers = os.cpu_count() or 1
+        if seed is None:
+            seed = np.random.randint(0, 2 ** 32, dtype=np.int64)
+        if n_workers <= 1:
+            samples = self._generate_samples(count, genders, namesets, seed=seed)
+            return [input_sample for input_sample, _, _ in samples]
+
+        # prepare the fake PII once, so workers get it from this process
+        self._prepare_fake_pii()
+
+        chunk_sizes = [
+            count // n_workers + (1 if rank < count % n_workers else 0)
+            for rank in range(n_workers)
+        ]
+        seed_seqs = np.random.SeedSequence(seed).spawn(n_workers)
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_sampling_worker,
+            initargs=(self,),
+        ) as executor:
+            chunks = executor.map(
+                _sample_chunk,
+                chunk_sizes,
+                [genders] * n_workers,
+                [namesets] * n_workers,
+                seed_seqs,
+            )
+            return list(itertools.chain.from_iterable(chunks))
 
+    def _prepare_fake_pii(self):
         if self.fake_pii is None:
             self.fake_pii = self.prep_fake_pii(self.original_pii_df)
+        # fake_pii is public and may have been set by the caller,
+        # rebuild what is derived from it when it's a different frame
+        if self._derived_from_fake_pii is not self.fake_pii:
+            # column values for sampling additional entities
+            self._fake_pii_columns = {
+                col: self.fake_pii[col].to_numpy() for col in self.fake_pii.columns
+            }
+            self._fake_pii_n = len(self.fake_pii)
+            self._template_slots = self._validate_templates(
+                set(self.fake_pii.columns)
+            )
+            self._derived_from_fake_pii = self.fake_pii
 
-        for _ in tqdm(range(count)):
-            # choose a template
-            template_sentence_index = random.choice(range(len(self.templates)))
-            original_sentence = self.templates[template_sentence_index]
+    def _validate_templates(
+        self, valid_entities: Set[str]
+    ) -> List[Tuple[List[str], List[str], Counter]]:
+        """
+        Check the placeholders of each template against the fake PII columns,
+        warning once for every placeholder which is missing
+        :param valid_entities: names of the fake PII columns
+        :return: per template, the placeholders to fill from the fake PII,
+        the placeholders left empty, and the counts of the available entities
+        """
+        template_slots = []
+        missing_placeholders = set()
+        for (_, segments, _), entities_count in zip(
+            self._compiled_templates, self._template_entity_counts
+        ):
+            available_count = Counter(
+                {
+                    entity: count
+                    for entity, count in entities_count.items()
+                    if entity in valid_entities
+                }
+            )
+            # keys of the fake PII record after _add_duplicated_entities
+            record_keys = {
+                entity + str(index)
+                for entity, count in available_count.items()
+                for index in range(2, count + 1)
+            }
+            record_keys.update(valid_entities)
+
+            present = []
+            missing = []
+            for _, placeholder, _ in segments:
+                if placeholder in record_keys:
+                    present.append(placeholder)
+                else:
+                    missing.append(placeholder)
+                    missing_placeholders.add(placeholder)
+            template_slots.append((present, missing, available_count))
+
+        for placeholder in sorted(missing_placeholders):
+            print(
+                f"Warning: entity {placeholder} is in the templates but not in the PII dataset. Ignoring."
+            )
+        return template_slots
+
+    def _generate_samples(
+        self,
+        count: int,
+        genders: Optional[List[str]],
+        namesets: Optional[List[str]],
+        seed: Union[None, int, np.random.SeedSequence] = None,
+        show_progress: bool = True,
+    ) -> Iterator[Tuple[InputSample, int, bool]]:
+        """
+        Generate count samples
+        :param seed: seed of the random draws. If None, it is derived from
+        the global numpy random state, so np.random.seed still applies
+        :return: tuples of the InputSample,
+        the index of its template and whether it was lower cased
+        """
+        self._prepare_fake_pii()
 
-            #filter Fake PII based on gender and nameset
-            fake_pii_subset = self._filter_fake_pii(genders, namesets)
+        # filter Fake PII based on gender and nameset
+        fake_pii_subset = self._filter_fake_pii(genders, namesets)
+        fake_pii_records = fake_pii_subset.to_dict("records")
 
-            #choose a Fake PII row randomly
-            fake_pii_sample = fake_pii_subset.sample(1).iloc[0]
+        # draw the template, Fake PII row and casing of all samples at once
+        if seed is None:
+            seed = np.random.randint(0, 2 ** 32, dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        template_indices = rng.integers(0, len(self._compiled_templates), size=count)
+        record_indices = rng.integers(0, len(fake_pii_records), size=count)
+        to_lower_draws = rng.random(count) < self.lower_case_ratio
 
-            # Find entities to be replaced + add running index for multiple entities of the same type
-            original_sentence, replacements, entity_counts = self.get_template_entities(
-                original_sentence
-            )
+        for i in tqdm(range(count), disable=not show_progress):
+            # choose a template
+            template_sentence_index = int(template_indices[i])
+
+            # choose a Fake PII row randomly
+            fake_pii_sample = fake_pii_records[record_indices[i]]
+            to_lower = bool(to_lower_draws[i])
+
+            # Entities to be replaced + running index for multiple entities of the same type
+            original_sentence, segments, text_after = self._compiled_templates[
+                template_sentence_index
+            ]
+            present, missing, entity_counts = self._template_slots[
+                template_sentence_index
+            ]
 
             # Get additional fake entries in case of multiple entities of the same type
             fake_pii_sample_duplicated = self._add_duplicated_entities(
-                fake_pii_sample, entity_counts
+                fake_pii_sample, entity_counts, rng
             )
 
-            # Fill in fake entities for each template slot
-            values = {}
-            for h in replacements:
-                if h in fake_pii_sample_duplicated:
-                    values[h] = str(fake_pii_sample_duplicated[h])
-                else:
-                    print(
-                        f"Warning: entity {h} is in the templates but not in the PII dataset. Ignoring."
-                    )
-                    values[h] = ""
+            # Fill in fake entities for each template slot,
+            # entities missing from the PII dataset are left empty
+            values = dict.fromkeys(missing, "")
+            for h in present:
+                values[h] = str(fake_pii_sample_duplicated[h])
 
             # Create a new InputSample combining template with fake PII data
-            input_sample = self._create_input_sample(original_sentence, values)
+            input_sample = self._create_input_sample(
+                original_sentence, values, to_lower, (segments, text_after)
+            )
 
             if self.include_metadata:
                     # "Gender": fake_pii_sample["GENDER"],
                     # "NameSet": fake_pii_sample["NAMESET"],
                     # "Country": fake_pii_sample["COUNTRY"],
                 metadata = {
-                    "Lowercase": input_sample.full_text.islower(),
+                    "Lowercase": to_lower,
                     "Template#": template_sentence_index,
                 }
                 input_sample.metadata = metadata
@@ -375,7 +680,7 @@ class FakeDataGenerator:
                 input_sample.tokens = tokens
                 input_sample.tags = tags
 
-            yield input_sample
+            yield input_sample, template_sentence_index, to_lower
 
     @staticmethod
     def _consolidate_names(input_sample: InputSample):
@@ -383,25 +688,37 @@ class FakeDataGenerator:
         change location realted tags to LOCATION
         change name related tags to PERSON
         """
-        locations = ("LOCATION", "CITY", "STATE", "COUNTRY", "ADDRESS", "STREET")
-        names = ("FIRST_NAME", "LAST_NAME", "PERSON")
-
-        for span in input_sample.spans:
-            if span.entity_type in names:
-                span.entity_type = "PERSON"
-            elif span.entity_type in locations:
-                span.entity_type = "LOCATION"
-
-        masked = input_sample.masked
-        for location in locations:
-            masked = masked.replace("[" + location + "]", "[LOCATION]")
-        for name in names:
-            masked = masked.replace("[" + name + "]", "[PERSON]")
+        spans = input_sample.spans
+        if len(spans) < _VECTORIZED_SPANS_THRESHOLD:
+            for span in spans:
+                if span.entity_type in _NAMES_SET:
+                    span.entity_type = "PERSON"
+                elif span.entity_type in _LOCATIONS_SET:
+                    span.entity_type = "LOCATION"
+        else:
+            entity_types = np.fromiter(
+                (span.entity_type for span in spans), dtype=object, count=len(spans)
+            )
+            entity_types = np.where(
+                np.isin(entity_types, _LOCATIONS_ARR), "LOCATION", entity_types
+            )
+            entity_types = np.where(
+                np.isin(entity_types, _NAMES_ARR), "PERSON", entity_types
+            )
+            for span, entity_type in zip(spans, entity_types):
+                span.entity_type = entity_type
 
+        masked = _LOC_NAME_RE.sub(
+            lambda m: "[" + _TAG_MAP[m.group(1)] + "]", input_sample.masked
+        )
         input_sample.masked = masked
 
     def _create_input_sample(
-        self, original_sentence: str, values: Dict[str, str]
+        self,
+        original_sentence: str,
+        values: Dict[str, str],
+        to_lower: bool,
+        split_template: Optional[Tuple[List[Tuple[str, str, str]], str]] = None,
     ) -> InputSample:
         """
         Creates an InputSample out of a template sentence
@@ -409,46 +726,52 @@ class FakeDataGenerator:
         :param original_sentence: template (e.g. My name is [FIRST_NAME})
         :param values: Key = entity name, value = entity value
         (e.g. {"TITLE":"Mr."})
-        :return: a list of InputSamples
+        :param to_lower: Whether to lower case the generated sentence
+        :param split_template: original_sentence as returned by _split_template,
+        if already computed
+        :return: an InputSample
         """
-        sentence = original_sentence
-        spans = []
+        if split_template is None:
+            split_template = self._split_template(original_sentence)
+        segments, text_after = split_template
 
-        to_lower = random.random() < self.lower_case_ratio
+        parts = []
+        spans = []
 
-        i = 0
+        # length of the output so far, and its last three characters.
+        # Empty strings are never added to parts, so parts[-1] always
+        # holds the last output character.
+        out_len = 0
+        tail = ""
         # replaces placeholders with values and retrieve indices
-        while i < len(sentence):
-            entity_start = re.search("{", sentence, flags=0)
-            if entity_start:
-                entity_start = entity_start.start()
-            else:
-                break
-            entity_end = (
-                re.search("}", sentence[entity_start:], flags=0).start() + entity_start
-            )
-            entity = sentence[entity_start + 1 : entity_end]
-            entity_value = values[entity]
+        for text_before, placeholder, entity in segments:
+            if text_before:
+                parts.append(text_before)
+            out_len += len(text_before)
+            tail = (tail + text_before)[-3:]
+
+            entity_value = values[placeholder]
             entity_value = entity_value.strip()
-            
-            # Remove duplicate entity indices:
-            entity = "".join(i for i in entity if not i.isdigit())
 
-            entity_value_len = len(entity_value)
-            sentence = (
-                sentence[:entity_start] + entity_value + sentence[entity_end + 1 :]
-            )
-            
-            # replace "a" with "an" if 
+            # replace "a" with "an" if the value starts with a vowel
             if (
-                (
-                    sentence[entity_start - 2 : entity_start].lower() == "a "
-                    and entity_start == 2
+                entity_value
+                and entity_value[0].lower() in _VOWELS
+                and (
+                    tail in _ARTICLE_TAILS
+                    or (out_len == 2 and tail in _ARTICLE_START)
                 )
-                or (sentence[entity_start - 3 : entity_start].lower() == " a ")
-            ) and entity_value[0].lower() in ["a", "e", "i", "o", "u"]:
-                sentence = sentence[: entity_start - 1] + "n " + sentence[entity_start:]
-                entity_start = entity_start + 1
+            ):
+                parts[-1] = parts[-1][:-1] + "n "
+                out_len += 1
+                tail = "an "
+
+            entity_start = out_len
+            entity_value_len = len(entity_value)
+            if entity_value:
+                parts.append(entity_value)
+            out_len += entity_value_len
+            tail = (tail + entity_value)[-3:]
 
             if to_lower:
                 entity_value = entity_value.lower()
@@ -461,7 +784,9 @@ class FakeDataGenerator:
                     end_position=entity_start + entity_value_len,
                 )
             )
-            i = entity_start + entity_value_len
+
+        parts.append(text_after)
+        sentence = "".join(parts)
 
         if to_lower:
             sentence = sentence.lower()
@@ -474,11 +799,16 @@ class FakeDataGenerator:
             create_tags_from_span=False,
         )
 
-    def _add_duplicated_entities(self, fake_pii_sample, entity_counts):
+    def _add_duplicated_entities(
+        self, fake_pii_sample, entity_counts, rng: np.random.Generator
+    ):
+        if any(ent_count > 1 for ent_count in entity_counts.values()):
+            # the records are shared between samples, don't modify them
+            fake_pii_sample = dict(fake_pii_sample)
         for entity, ent_count in entity_counts.items():
             while ent_count > 1:
                 fake_pii_sample[entity + str(ent_count)] = self._get_additional_entity(
-                    self.fake_pii, entity
+                    entity, rng
                 )
                 ent_count -= 1
 
@@ -496,3 +826,24 @@ class FakeDataGenerator:
             subset = subset[subset["NAMESET"].isin(namesets)]
 
         return subset
+
+
+# Generator used by the processes of FakeDataGenerator.sample_examples_parallel
+_worker_generator: Optional[FakeDataGenerator] = None
+
+
+def _init_sampling_worker(generator: FakeDataGenerator):
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _sample_chunk(
+    count: int,
+    genders: Optional[List[str]],
+    namesets: Optional[List[str]],
+    seed_seq: np.random.SeedSequence,
+) -> List[InputSample]:
+    samples = _worker_generator._generate_samples(
+        count, genders, namesets, seed=seed_seq, show_progress=False
+    )
+    return [input_sample for input_sample, _, _ in samples]